@@ -0,0 +1,55 @@
+from typing import List, Sequence
+from models import ExtractionResult
+
+# Large documents are split and extracted concurrently
+CHUNK_THRESHOLD = 20_000
+CHUNK_CHARS = 8_000
+
+# Prefer paragraph breaks, then line breaks; anything still too long is cut at the limit
+_SEPARATORS = ("\n\n", "\n")
+
+def split_chunks(text: str, limit: int = CHUNK_CHARS, separators: Sequence[str] = _SEPARATORS) -> List[str]:
+    if len(text) <= limit:
+        return [text]
+    if not separators:
+        return [text[i:i + limit] for i in range(0, len(text), limit)]
+
+    separator, finer = separators[0], separators[1:]
+    chunks, current, size = [], [], 0
+    for part in text.split(separator):
+        if len(part) > limit:
+            if current:
+                chunks.append(separator.join(current))
+                current, size = [], 0
+            chunks.extend(split_chunks(part, limit, finer))
+            continue
+
+        added = len(part) + (len(separator) if current else 0)
+        if size + added > limit:
+            chunks.append(separator.join(current))
+            current, size = [part], len(part)
+        else:
+            current.append(part)
+            size += added
+
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+def merge_results(results: Sequence[ExtractionResult]) -> ExtractionResult:
+    # Different chunks can restate the same action item, so keep the first task per normalized title
+    seen = set()
+    tasks = []
+    for result in results:
+        for task in result.tasks:
+            key = " ".join(task.title.casefold().split())
+            if key not in seen:
+                seen.add(key)
+                tasks.append(task)
+
+    return ExtractionResult(
+        project_name=next((r.project_name for r in results if r.project_name), None),
+        meeting_date=next((r.meeting_date for r in results if r.meeting_date), None),
+        summary="\n\n".join(r.summary for r in results if r.summary),
+        tasks=tasks
+    )
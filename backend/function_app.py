@@ -1,84 +1,181 @@
 import azure.functions as func
+import asyncio
 import logging
-import json
 import os
+import re
+import threading
+import httpx
+from typing import List
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 from pydantic import ValidationError
-from models import ExtractionResult
+from models import ExtractionResult, IngestRequest, IngestResponse
+from chunking import CHUNK_THRESHOLD, merge_results, split_chunks
 
 app = func.FunctionApp(http_auth_level=func.AuthLevel.FUNCTION)
 
+logger = logging.getLogger(__name__)
+
+# The instructions never change at runtime, so build them once at import and send the document
+# as a separate part instead of copying it into one large prompt string.
+# The output shape is enforced by the response schema, so it is not repeated in the prompt.
+_PROMPT_PREFIX = """
+You are an expert Project Manager AI.
+Analyze the following text and extract all actionable tasks.
+
+CRITICAL RULES:
+1. If no date is found, use null.
+2. Be concise.
+
+TEXT TO ANALYZE:
+"""
+
+_PROMPT_PART = types.Part.from_text(text=_PROMPT_PREFIX)
+
+# The schema is the only place field semantics reach the model (enum values, date format, ...),
+# so those descriptions stay; the ones that just restate the field name are dropped to save tokens
+_KEEP_DESCRIPTIONS = {"title", "status", "priority", "owner", "deadline", "source_evidence"}
+
+def _slim_schema(node, name=None):
+    if isinstance(node, dict):
+        return {
+            key: _slim_schema(value, key)
+            for key, value in node.items()
+            if not (key == "description" and isinstance(value, str) and name not in _KEEP_DESCRIPTIONS)
+        }
+    if isinstance(node, list):
+        return [_slim_schema(item) for item in node]
+    return node
+
+_SLIM_SCHEMA = _slim_schema(ExtractionResult.model_json_schema())
+
+_GEN_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_json_schema=_SLIM_SCHEMA
+)
+
+# Anything shorter cannot hold a task (the upper bound is enforced by IngestRequest)
+MIN_CHARS = 32
+
+_SPACE_RUNS = re.compile(r"[ \t]+")
+_BLANK_LINES = re.compile(r"\n\s*\n")
+
+# Caps in-flight Gemini calls per chunked request so one large document can't exhaust the rate limit
+MAX_CHUNK_CALLS = 8
+
+# The success envelope is a model too, so the whole body is serialized in one pydantic-core pass
+def _success_body(result: ExtractionResult) -> bytes:
+    return IngestResponse(status="success", message="AI Extraction Complete", data=result).model_dump_json().encode()
+
+_EMPTY_SUCCESS_BODY = _success_body(ExtractionResult(project_name=None, meeting_date=None, summary="", tasks=[]))
+
+def _success_response(body: bytes) -> func.HttpResponse:
+    return func.HttpResponse(body, mimetype="application/json", status_code=200)
+
+# Reuse one client (and its HTTP connection pool) across invocations
+_client = None
+_client_lock = threading.Lock()
+
+def _get_client(api_key: str) -> genai.Client:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = genai.Client(
+                    api_key=api_key,
+                    http_options=types.HttpOptions(
+                        # HTTP/2 lets concurrent ingests multiplex over one kept-alive connection.
+                        # Pass the client itself: async_client_args is ignored when the SDK picks aiohttp.
+                        httpx_async_client=httpx.AsyncClient(
+                            http2=True,
+                            limits=httpx.Limits(
+                                max_connections=100,
+                                max_keepalive_connections=50,
+                                keepalive_expiry=300
+                            )
+                        )
+                    )
+                )
+    return _client
+
+async def _extract(client: genai.Client, text: str) -> ExtractionResult:
+    # 3. Construct the Prompt
+    contents = [_PROMPT_PART, types.Part.from_text(text=text)]
+
+    # 4. Call Gemini (Modern 2026 Syntax)
+    # Stream the output so the transfer overlaps generation; the JSON is only validated once complete
+    stream = await client.aio.models.generate_content_stream(
+        model="gemini-3-flash-preview",
+        contents=contents,
+        config=_GEN_CONFIG
+    )
+    response_text = "".join([chunk.text async for chunk in stream if chunk.text])
+
+    # 5. Validate the AI's Output (parse + validate in a single pass)
+    return ExtractionResult.model_validate_json(response_text)
+
+async def _extract_chunks(client: genai.Client, chunks: List[str]) -> List[ExtractionResult]:
+    # The limit is per request, so other requests on this worker never queue behind a large document
+    slots = asyncio.Semaphore(MAX_CHUNK_CALLS)
+
+    async def _extract_limited(chunk: str) -> ExtractionResult:
+        async with slots:
+            return await _extract(client, chunk)
+
+    tasks = [asyncio.ensure_future(_extract_limited(chunk)) for chunk in chunks]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        # One failed chunk fails the request, so stop the rest instead of letting them burn quota
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
 @app.route(route="ingest")
-def ingest(req: func.HttpRequest) -> func.HttpResponse:
-    logging.info('AI Ingest function triggered.')
+async def ingest(req: func.HttpRequest) -> func.HttpResponse:
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('AI Ingest function triggered.')
 
     # 1. Configure the AI (The Brain)
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key:
         return func.HttpResponse("Error: GEMINI_API_KEY is missing.", status_code=500)
 
-    # Initialize the Modern Client
-    client = genai.Client(api_key=api_key)
+    # Reuse the Modern Client
+    client = _get_client(api_key)
 
+    # 2. Get the Raw Text (parsed and validated in a single pass)
     try:
-        # 2. Get the Raw Text
-        req_body = req.get_json()
-        raw_text = req_body.get("document_text")
+        payload = IngestRequest.model_validate_json(req.get_body())
+    except ValidationError as e:
+        return func.HttpResponse(e.json(include_input=False), status_code=400, mimetype="application/json")
 
-        if not raw_text:
-            return func.HttpResponse("Error: 'document_text' field is required.", status_code=400)
+    # Collapse whitespace runs and duplicate blank lines to save input tokens
+    raw_text = _BLANK_LINES.sub("\n\n", _SPACE_RUNS.sub(" ", payload.document_text)).strip()
 
-    except ValueError:
-        return func.HttpResponse("Error: Body must be valid JSON.", status_code=400)
+    # Nothing worth sending to Gemini
+    if len(raw_text) < MIN_CHARS:
+        return _success_response(_EMPTY_SUCCESS_BODY)
 
     try:
-        # 3. Construct the Prompt
-        schema_json = json.dumps(ExtractionResult.model_json_schema(), indent=2)
-
-        prompt = f"""
-        You are an expert Project Manager AI. 
-        Analyze the following text and extract all actionable tasks.
-        
-        CRITICAL RULES:
-        1. Output MUST be strictly matching this JSON Schema:
-        {schema_json}
-        
-        2. If no date is found, use null.
-        3. Be concise.
-
-        TEXT TO ANALYZE:
-        {raw_text}
-        """
-
-        # 4. Call Gemini (Modern 2026 Syntax)
-        logging.info("Sending text to Gemini...")
-        
-        response = client.models.generate_content(
-            model="gemini-3-flash-preview",
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json"
-            )
-        )
-        
-        # 5. Validate the AI's Output
-        ai_data = json.loads(response.text)
-        validated_result = ExtractionResult(**ai_data)
+        logger.info("Sending text to Gemini (len=%d)", len(raw_text))
+
+        if len(raw_text) > CHUNK_THRESHOLD:
+            results = await _extract_chunks(client, split_chunks(raw_text))
+            validated_result = merge_results(results)
+        else:
+            validated_result = await _extract(client, raw_text)
 
         # 6. Return the Result
-        return func.HttpResponse(
-            json.dumps({
-                "status": "success", 
-                "message": "AI Extraction Complete",
-                "data": validated_result.model_dump()
-            }),
-            mimetype="application/json",
-            status_code=200
-        )
+        return _success_response(_success_body(validated_result))
 
     except ValidationError as e:
-        return func.HttpResponse(f"AI returned invalid data structure: {e.json()}", status_code=500)
-    except Exception as e:
-        logging.error(f"General Error: {str(e)}")
-        return func.HttpResponse(f"Server Error: {str(e)}", status_code=500)
\ No newline at end of file
+        return func.HttpResponse(f"AI returned invalid data structure: {e.json(include_input=False)}", status_code=500)
+    except errors.APIError as e:
+        logger.error("Gemini API error: %s", e.code)
+        return func.HttpResponse('{"error":"upstream"}', mimetype="application/json", status_code=502)
+    except Exception:
+        # SDK errors can carry the whole prompt, so never echo them back
+        logger.exception("ingest failed")
+        return func.HttpResponse("Server Error", status_code=500)
\ No newline at end of file
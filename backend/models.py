@@ -1,8 +1,9 @@
 from typing import List, Optional
-from pydantic import BaseModel, Field
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
 
 class TaskItem(BaseModel):
+    # Write-once DTO built from LLM output
+    model_config = ConfigDict(extra="ignore", frozen=True)
 
     title: str = Field(description="A concise, action-oriented summary of the task")
     
@@ -19,13 +20,27 @@ class TaskItem(BaseModel):
     source_evidence: Optional[str] = Field(default=None, description="The specific quote that justified this task")
 
 class ExtractionResult(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     project_name: Optional[str] = Field(description="Inferred name of the project")
     meeting_date: Optional[str] = Field(description="Date of the meeting")
     summary: str = Field(description="Executive summary of the document")
     tasks: List[TaskItem] = Field(description="List of extracted action items")
 
+class IngestRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    document_text: str = Field(min_length=1, max_length=200_000, description="Raw document or meeting notes to analyze")
+
+class IngestResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    status: str
+    message: str
+    data: ExtractionResult
+
 class GitHubCommit(BaseModel):
     commit_hash: str
     author: str
     message: str
-    timestamp: str
\ No newline at end of file
+    timestamp: str
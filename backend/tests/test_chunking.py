@@ -0,0 +1,71 @@
+from chunking import merge_results, split_chunks
+from models import ExtractionResult, TaskItem
+
+
+def _result(tasks, project_name=None, meeting_date=None, summary=""):
+    return ExtractionResult(
+        project_name=project_name,
+        meeting_date=meeting_date,
+        summary=summary,
+        tasks=[TaskItem(title=title) for title in tasks]
+    )
+
+
+def test_short_text_is_a_single_chunk():
+    assert split_chunks("one\n\ntwo", limit=100) == ["one\n\ntwo"]
+
+
+def test_paragraphs_are_packed_up_to_the_limit():
+    text = "\n\n".join(["a" * 40] * 5)
+
+    chunks = split_chunks(text, limit=100)
+
+    assert chunks == ["a" * 40 + "\n\n" + "a" * 40] * 2 + ["a" * 40]
+
+
+def test_single_newline_text_is_split_on_lines():
+    lines = ["line %03d " % i + "x" * 50 for i in range(2000)]
+    text = "\n".join(lines)
+
+    chunks = split_chunks(text, limit=8_000)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 8_000 for chunk in chunks)
+    assert "\n".join(chunks) == text
+
+
+def test_oversized_paragraph_is_split_without_merging_neighbours():
+    text = "intro\n\n" + "\n".join(["y" * 30] * 10) + "\n\noutro"
+
+    chunks = split_chunks(text, limit=100)
+
+    assert chunks[0] == "intro"
+    assert chunks[-1] == "outro"
+    assert all(len(chunk) <= 100 for chunk in chunks)
+
+
+def test_text_without_any_newline_is_hard_split():
+    chunks = split_chunks("z" * 250, limit=100)
+
+    assert chunks == ["z" * 100, "z" * 100, "z" * 50]
+
+
+def test_merge_deduplicates_tasks_across_chunks():
+    merged = merge_results([
+        _result(["Ship the release", "Write docs"]),
+        _result(["  ship THE   release ", "Book venue"]),
+    ])
+
+    assert [task.title for task in merged.tasks] == ["Ship the release", "Write docs", "Book venue"]
+
+
+def test_merge_takes_first_known_metadata_and_joins_summaries():
+    merged = merge_results([
+        _result([], summary="Part one"),
+        _result([], project_name="Atlas", meeting_date="2026-01-05", summary="Part two"),
+        _result([], project_name="Other", summary=""),
+    ])
+
+    assert merged.project_name == "Atlas"
+    assert merged.meeting_date == "2026-01-05"
+    assert merged.summary == "Part one\n\nPart two"
@@ -0,0 +1,80 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import function_app
+
+_RESULT_JSON = '{"project_name":null,"meeting_date":null,"summary":"s","tasks":[]}'
+
+
+class _FakeModels:
+    def __init__(self, delay, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.started = 0
+        self.finished = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content_stream(self, model, contents, config):
+        self.started += 1
+        if self.fail_on is not None and contents[1].text == self.fail_on:
+            raise RuntimeError("upstream failure")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        self.finished += 1
+
+        async def stream():
+            yield SimpleNamespace(text=_RESULT_JSON)
+
+        return stream()
+
+
+def _fake_client(models):
+    return SimpleNamespace(aio=SimpleNamespace(models=models))
+
+
+def test_single_call_is_not_queued_behind_chunked_request():
+    delay = 0.05
+    client = _fake_client(_FakeModels(delay))
+    chunks = ["chunk %d" % i for i in range(26)]
+
+    async def run():
+        start = time.monotonic()
+        chunked = asyncio.ensure_future(function_app._extract_chunks(client, chunks))
+        await asyncio.sleep(delay / 10)
+        await function_app._extract(client, "short document")
+        single_elapsed = time.monotonic() - start
+        await chunked
+        return single_elapsed, time.monotonic() - start
+
+    single_elapsed, chunked_elapsed = asyncio.run(run())
+
+    assert single_elapsed < 2 * delay
+    assert chunked_elapsed >= 4 * delay
+
+
+def test_chunk_fan_out_is_capped_per_request():
+    models = _FakeModels(0.01)
+
+    results = asyncio.run(function_app._extract_chunks(_fake_client(models), ["c%d" % i for i in range(20)]))
+
+    assert len(results) == 20
+    assert models.max_in_flight == function_app.MAX_CHUNK_CALLS
+
+
+def test_failed_chunk_cancels_the_rest():
+    models = _FakeModels(0.05, fail_on="c0")
+    chunks = ["c%d" % i for i in range(26)]
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(function_app._extract_chunks(_fake_client(models), chunks))
+
+    assert models.started < len(chunks)
+    assert models.finished == 0